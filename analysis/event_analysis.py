@@ -4,13 +4,30 @@ from pathlib import Path
 
 BASE_DIR = Path(__file__).parent.resolve()
 
+def window_mean(cs, lo, hi):
+    """Mean of values[lo:hi] from prefix sums cs"""
+    m = hi - lo
+    return (cs[hi] - cs[lo]) / m if m > 0 else np.nan
+
+def window_std(cs, cs2, lo, hi):
+    """Sample standard deviation (ddof=1) of values[lo:hi] from prefix sums"""
+    m = hi - lo
+    if m < 2:
+        return np.nan
+    var = (cs2[hi] - cs2[lo] - (cs[hi] - cs[lo]) ** 2 / m) / (m - 1)
+    return np.sqrt(max(var, 0.0))
+
 def analyze_event_impacts():
     print("\nAnalyzing event impacts...")
     
     try:
         # Load data
         data_path = BASE_DIR.parent / 'data' / 'processed_data.csv'
-        df = pd.read_csv(data_path, parse_dates=['Date'], index_col='Date')
+        parquet_path = data_path.with_suffix('.parquet')
+        if parquet_path.exists():
+            df = pd.read_parquet(parquet_path)
+        else:
+            df = pd.read_csv(data_path, parse_dates=['Date'], index_col='Date')
         df = df.loc['2012-01-01':'2022-09-30']
         
         # Load change points
@@ -21,25 +38,48 @@ def analyze_event_impacts():
         events_path = BASE_DIR.parent / 'data' / 'events.csv'
         events = pd.read_csv(events_path, parse_dates=['Date'])
         
+        # Prefix sums turn every window mean/std into an O(1) lookup
+        window = 30
+        delta = np.timedelta64(window, 'D')
+        idx_ns = df.index.values.astype('datetime64[ns]')
+        price = df['Price'].to_numpy(dtype=np.float64)
+        log_ret = df['Log_Return'].to_numpy(dtype=np.float64)
+        cs_p = np.concatenate(([0.0], np.cumsum(price)))
+        cs_r = np.concatenate(([0.0], np.cumsum(log_ret)))
+        cs_r2 = np.concatenate(([0.0], np.cumsum(log_ret ** 2)))
+        
+        # Sorted event dates as int64 nanoseconds allow a binary search for the nearest event
+        events = events.sort_values('Date').reset_index(drop=True)
+        ev_i8 = events['Date'].values.astype('datetime64[ns]').view('i8')
+        ns_per_day = 86_400_000_000_000
+        
         # Analyze each change point
         results = []
         for cp in change_points['Change_Point']:
-            # Find closest event within 30 days
-            time_diff = (events['Date'] - cp).abs()
-            closest_idx = time_diff.idxmin()
+            # Find closest event within 30 days: one of cp's two neighbours
+            pos = np.searchsorted(ev_i8, cp.value)
+            lo = max(pos - 1, 0)
+            diff = np.abs(ev_i8[lo:pos + 1] - cp.value)
+            closest_idx = lo + int(diff.argmin())
             closest_event = events.loc[closest_idx]
-            days_diff = time_diff.min().days
+            days_diff = int(diff.min()) // ns_per_day
             
             if days_diff <= 30:
+                # Inclusive windows [cp - 30d, cp] and [cp, cp + 30d]
+                cp_ns = cp.to_datetime64()
+                pre_lo = np.searchsorted(idx_ns, cp_ns - delta, side='left')
+                pre_hi = np.searchsorted(idx_ns, cp_ns, side='right')
+                post_lo = np.searchsorted(idx_ns, cp_ns, side='left')
+                post_hi = np.searchsorted(idx_ns, cp_ns + delta, side='right')
+                
                 # Calculate price impact
-                window = 30
-                pre = df[cp - pd.Timedelta(days=window):cp]['Price'].mean()
-                post = df[cp:cp + pd.Timedelta(days=window)]['Price'].mean()
+                pre = window_mean(cs_p, pre_lo, pre_hi)
+                post = window_mean(cs_p, post_lo, post_hi)
                 pct_change = (post - pre) / pre * 100
                 
                 # Calculate volatility impact
-                pre_vol = df[cp - pd.Timedelta(days=window):cp]['Log_Return'].std()
-                post_vol = df[cp:cp + pd.Timedelta(days=window)]['Log_Return'].std()
+                pre_vol = window_std(cs_r, cs_r2, pre_lo, pre_hi)
+                post_vol = window_std(cs_r, cs_r2, post_lo, post_hi)
                 vol_pct_change = (post_vol - pre_vol) / pre_vol * 100
                 
                 results.append({
@@ -1,29 +1,59 @@
-from flask import Flask, jsonify
+from flask import Flask
 import pandas as pd
 from flask_cors import CORS
 import os
 import traceback
 from datetime import datetime
-import json
+import orjson
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
+def ojsonify(obj, status=200):
+    """jsonify replacement backed by orjson (also encodes NumPy values)"""
+    return app.response_class(
+        orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY),
+        status=status,
+        mimetype='application/json'
+    )
+
+# Serialized /api/data body, keyed by the modification times of its source files
+_cache = {"key": None, "body": None}
+
+def _mtime(path):
+    """Modification time of path, or None if it does not exist (one stat call)"""
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+def parquet_path_for(path):
+    """Path of the Parquet copy safe_read_csv prefers over the CSV at path"""
+    return os.path.splitext(path)[0] + '.parquet'
+
 def safe_read_csv(path, date_cols=None):
     try:
+        # Prefer the Parquet copy written by the pipeline, which needs no text parsing
+        parquet_path = parquet_path_for(path)
+        if os.path.exists(parquet_path):
+            print(f"Attempting to read: {parquet_path}")
+            df = pd.read_parquet(parquet_path)
+            if df.index.name is not None:
+                df = df.reset_index()
+            # Convert dates to ISO format strings
+            for col in date_cols or []:
+                if col in df.columns:
+                    df[col] = df[col].dt.strftime('%Y-%m-%d')
+            return df
+        
         print(f"Attempting to read: {path}")
         if not os.path.exists(path):
             print(f"File not found: {path}")
             return pd.DataFrame()
-            
-        if date_cols:
-            df = pd.read_csv(path, parse_dates=date_cols)
-            # Convert dates to ISO format strings
-            for col in date_cols:
-                if col in df.columns:
-                    df[col] = pd.to_datetime(df[col]).dt.strftime('%Y-%m-%d')
-            return df
-        return pd.read_csv(path)
+        
+        # Dates are stored as ISO strings already, so read them as text instead of parsing
+        dtype = {col: str for col in date_cols} if date_cols else None
+        return pd.read_csv(path, dtype=dtype)
     except Exception as e:
         print(f"Error reading {path}: {str(e)}")
         traceback.print_exc()
@@ -34,7 +64,8 @@ def get_data():
     try:
         # Get the absolute path to the project root
         base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'))
-        print(f"Base directory: {base_dir}")
+        if app.debug:
+            print(f"Base directory: {base_dir}")
         
         # Define file paths
         data_files = {
@@ -43,11 +74,20 @@ def get_data():
             'change_points': os.path.join(base_dir, 'analysis', 'change_points.csv')
         }
         
-        # Log file status
-        for name, path in data_files.items():
-            print(f"{name} path: {path}")
-            print(f"{name} exists: {os.path.exists(path)}")
-            print(f"{name} size: {os.path.getsize(path) if os.path.exists(path) else 0} bytes")
+        # Serve from memory while none of the source files (CSV or the Parquet
+        # copy safe_read_csv actually reads) have changed
+        key = tuple(
+            (_mtime(p), _mtime(parquet_path_for(p))) for p in data_files.values()
+        )
+        if key == _cache["key"]:
+            return app.response_class(_cache["body"], mimetype='application/json')
+        
+        # Log file status (debug only: costs extra stat calls per request)
+        if app.debug:
+            for name, path in data_files.items():
+                print(f"{name} path: {path}")
+                print(f"{name} exists: {os.path.exists(path)}")
+                print(f"{name} size: {os.path.getsize(path) if os.path.exists(path) else 0} bytes")
         
         # Load data
         prices = safe_read_csv(data_files['prices'], date_cols=['Date'])
@@ -55,35 +95,38 @@ def get_data():
         change_points = safe_read_csv(data_files['change_points'])
         
         # Log data status
-        print(f"Prices rows: {len(prices)}")
-        print(f"Impacts rows: {len(impacts)}")
-        print(f"Change points rows: {len(change_points)}")
+        if app.debug:
+            print(f"Prices rows: {len(prices)}")
+            print(f"Impacts rows: {len(impacts)}")
+            print(f"Change points rows: {len(change_points)}")
         
-        # Convert to dictionaries
-        prices_dict = prices.to_dict('records') if not prices.empty else []
+        # Convert to dictionaries (prices as columns to avoid one dict per row)
+        prices_cols = {c: prices[c].tolist() for c in prices.columns}
         impacts_dict = impacts.to_dict('records') if not impacts.empty else []
         change_points_dict = change_points.to_dict('records') if not change_points.empty else []
         
         # Create response
         response = {
-            'prices': prices_dict,
+            'prices': prices_cols,
             'events': impacts_dict,
             'changePoints': change_points_dict,
             'meta': {
-                'prices_count': len(prices_dict),
+                'prices_count': len(prices),
                 'events_count': len(impacts_dict),
                 'change_points_count': len(change_points_dict),
                 'generated_at': datetime.now().isoformat()
             }
         }
         
-        return jsonify(response)
+        result = ojsonify(response)
+        _cache["key"], _cache["body"] = key, result.get_data()
+        return result
     except Exception as e:
         traceback.print_exc()
-        return jsonify({
+        return ojsonify({
             'error': f"Server error: {str(e)}",
             'trace': traceback.format_exc()
-        }), 500
+        }, status=500)
 
 @app.route('/api/debug')
 def debug_info():
@@ -103,7 +146,7 @@ def debug_info():
             except Exception as e:
                 return {'error': str(e)}
         
-        return jsonify({
+        return ojsonify({
             'working_directory': os.getcwd(),
             'base_dir': base_dir,
             'data_dir': list_dir(os.path.join(base_dir, 'data')),
@@ -111,11 +154,11 @@ def debug_info():
             'environment': dict(os.environ)
         })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojsonify({'error': str(e)}, status=500)
 
 @app.route('/api/health')
 def health_check():
-    return jsonify({
+    return ojsonify({
         'status': 'healthy', 
         'version': '1.0.0',
         'time': datetime.now().isoformat()
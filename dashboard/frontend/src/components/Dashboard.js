@@ -25,11 +25,11 @@ const Dashboard = () => {
         
         // Process data
         const processedData = {
-          prices: jsonData.prices.map(item => ({
-            ...item,
-            Date: new Date(item.Date),
-            Price: parseFloat(item.Price),
-            Log_Return: parseFloat(item.Log_Return)
+          // Prices arrive as columns; zip them back into rows for the charts
+          prices: (jsonData.prices.Date || []).map((date, i) => ({
+            Date: new Date(date),
+            Price: parseFloat(jsonData.prices.Price[i]),
+            Log_Return: parseFloat(jsonData.prices.Log_Return[i])
           })),
           events: jsonData.events.map(event => ({
             ...event,